@@ -1,3 +1,5 @@
+import copy
+
 import pandas as pd
 from apputil import GroupEstimate
 
@@ -5,7 +7,12 @@ from apputil import GroupEstimate
 def main():
     """Run group-based estimation on the coffee dataset."""
 
-    df = pd.read_csv("coffee_analysis.csv")
+    # Only parse the columns the model uses
+    df = pd.read_csv(
+        "coffee_analysis.csv",
+        usecols=["loc_country", "roast", "rating"],
+        dtype={"loc_country": "category", "roast": "category"},
+    )
 
     # Select predictors (categorical features) and target (continuous variable)
     X = df[["loc_country", "roast"]]
@@ -25,9 +32,10 @@ def main():
     # Display predictions
     print("Predictions:", gm.predict(X_new))
 
-    # Example using a fallback category for missing combinations
-    gm2 = GroupEstimate(estimate="mean")
-    gm2.fit(X, y, default_category="loc_country")
+    # Example using a fallback category for missing combinations; the group
+    # estimates are shared with gm, so only the fallback is fitted
+    gm2 = copy.copy(gm)
+    gm2.fit_fallback(X, y, default_category="loc_country")
 
     print("Predictions with fallback:", gm2.predict(X_new))
 
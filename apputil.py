@@ -1,6 +1,65 @@
+import math
+import warnings
+from collections.abc import Mapping
+
 import pandas as pd
 import numpy as np
 
+# Largest dense lookup table (in cells) built at fit time; beyond this the
+# table would grow with the product of the key cardinalities, so only the
+# observed groups are indexed instead
+_DENSE_TABLE_MAX_CELLS = 1_000_000
+
+
+def _group_estimate(codes, values, estimate):
+    """
+    Aggregate values over groups given by integer category codes.
+
+    Parameters
+    ----------
+    codes : list of np.ndarray
+        One array of category codes per grouping column. Rows with a
+        negative code (a missing key) are dropped, as groupby does.
+    values : np.ndarray
+        Float values to aggregate within each group.
+    estimate : str
+        Either mean or median.
+
+    Returns
+    -------
+    tuple
+        The per-column codes of each observed group (sorted as groupby
+        would sort them) and the matching estimates.
+    """
+    keep = np.logical_and.reduce([code >= 0 for code in codes])
+    if not keep.all():
+        codes = [code[keep] for code in codes]
+        values = values[keep]
+
+    # Build sorted, dense group ids one column at a time, re-factorizing after
+    # each step so ids stay below the row count; unlike a flat product index
+    # over all columns this cannot overflow with high-cardinality keys
+    group_ids = np.zeros(len(values), dtype=np.int64)
+    steps = []
+    for code in codes:
+        size = int(code.max(initial=0)) + 1
+        group_ids, uniq = pd.factorize(group_ids * size + code, sort=True)
+        steps.append((uniq, size))
+
+    if estimate == "mean":
+        est = np.bincount(group_ids, weights=values) / np.bincount(group_ids)
+    else:
+        est = pd.Series(values).groupby(group_ids).median().to_numpy()
+
+    # Walk the steps backwards to recover each group's per-column codes
+    positions = []
+    ids = np.arange(len(est))
+    for uniq, size in reversed(steps):
+        combined = uniq[ids]
+        positions.append(combined % size)
+        ids = combined // size
+    return tuple(reversed(positions)), est
+
 
 class GroupEstimate:
     """
@@ -25,6 +84,10 @@ class GroupEstimate:
         self.group_estimates = None
         self.default_category = None
         self.default_estimates = None
+        self._categories = None
+        self._table = None
+        self._group_codes = None
+        self._default_table = None
 
     def fit(self, X, y, default_category=None):
         """
@@ -38,46 +101,123 @@ class GroupEstimate:
             A single column name in X to use as a fallback if a full
             category combination is missing during prediction.
         """
-        # validation
-        if not isinstance(X, pd.DataFrame):
-            raise TypeError("X must be a pandas DataFrame of categorical columns.")
-        if len(X) != len(y):
-            raise ValueError("X and y must have the same length.")
-        if pd.isna(pd.Series(y)).any():
-            raise ValueError("y contains missing values; remove or impute them before fitting.")
-
-        self.default_category = default_category
+        y_arr = self._validate(X, y)
 
-        # Combine features and target into one DataFrame
-        df = pd.concat([X.reset_index(drop=True), pd.Series(y).reset_index(drop=True)], axis=1)
-        target_name = y.name if hasattr(y, "name") and y.name is not None else df.columns[-1]
+        # Factorize each column once; the codes drive the group estimates,
+        # the fallback and the lookup table positions
+        target_name = y.name if getattr(y, "name", None) is not None else "_y"
+        keys = X.astype("category")
+        self._categories = [keys[c].cat.categories for c in X.columns]
+        codes = [keys[c].cat.codes.to_numpy() for c in X.columns]
+        sizes = [len(cat) for cat in self._categories]
 
         # Compute group-level mean or median
-        if self.estimate == "mean":
-            group_est = df.groupby(list(X.columns), observed=True)[target_name].mean()
+        positions, est = _group_estimate(codes, y_arr, self.estimate)
+
+        # Ratings need nowhere near float64 precision; float32 halves the
+        # size of the estimates and lookup tables
+        est = est.astype(np.float32)
+        if len(sizes) == 1:
+            index = self._categories[0].take(positions[0]).rename(X.columns[0])
         else:
-            group_est = df.groupby(list(X.columns), observed=True)[target_name].median()
+            index = pd.MultiIndex(
+                levels=self._categories, codes=positions, names=list(X.columns)
+            )
+        self.group_estimates = pd.Series(est, index=index, name=target_name)
 
-        self.group_estimates = group_est
+        # Dense lookup table indexed by each column's category code, so
+        # prediction is a single fancy-index gather (unseen cells are NaN).
+        # For large key spaces, index only the observed code combinations.
+        self._table = None
+        self._group_codes = None
+        if math.prod(sizes) <= _DENSE_TABLE_MAX_CELLS:
+            self._table = np.full(sizes, np.nan, dtype=np.float32)
+            self._table[positions] = est
+        else:
+            self._group_codes = pd.MultiIndex.from_arrays(positions)
 
         # Compute fallback estimates if default_category is provided and present
+        self._fit_default(
+            dict(zip(X.columns, codes)), y_arr, target_name, default_category, list(X.columns)
+        )
+
+    def fit_fallback(self, X, y, default_category):
+        """
+        Fit only the fallback estimates on an already fitted estimator.
+
+        This reuses the group estimates from fit(), so a model that
+        differs only in default_category does not redo the full groupby.
+
+        Parameters
+        ----------
+        X : Categorical features with the same columns as X used in fit().
+        y : Continuous values corresponding to X.
+        default_category : str
+            A single column name in X to use as a fallback if a full
+            category combination is missing during prediction.
+        """
+        if self.group_estimates is None:
+            raise RuntimeError("Model has not been fitted. Call fit(X, y) before fit_fallback().")
+        y_arr = self._validate(X, y)
+        target_name = y.name if getattr(y, "name", None) is not None else "_y"
+
+        expected_cols = list(self.group_estimates.index.names)
+        if not set(expected_cols) <= set(X.columns):
+            raise ValueError(
+                f"Fallback input columns {list(X.columns)} do not include the fitted "
+                f"columns {expected_cols}."
+            )
+
+        # Encode with the categories seen in fit() so codes line up with the tables
+        codes = {}
+        if default_category in expected_cols:
+            dc_cat = self._categories[expected_cols.index(default_category)]
+            codes[default_category] = dc_cat.get_indexer(X[default_category])
+        self._fit_default(codes, y_arr, target_name, default_category, list(X.columns))
+
+    @staticmethod
+    def _validate(X, y):
+        """Check fit inputs and return y as a float64 array."""
+        if not isinstance(X, pd.DataFrame):
+            raise TypeError("X must be a pandas DataFrame of categorical columns.")
+        if len(X) != len(y):
+            raise ValueError("X and y must have the same length.")
+        y_arr = np.asarray(y, dtype=np.float64)
+        if np.isnan(y_arr).any():
+            raise ValueError("y contains missing values; remove or impute them before fitting.")
+        return y_arr
+
+    def _fit_default(self, codes, y_arr, target_name, default_category, columns):
+        """Compute the fallback estimates and table from per-column codes."""
+        self.default_category = default_category
         self.default_estimates = None
-        if default_category is not None:
-            if default_category not in X.columns:
-                # keep default_estimates = None but warns user
-                print(
-                    f"Warning: default_category='{default_category}' not in X columns; "
-                    "fallback will not be available."
-                )
+        self._default_table = None
+        if default_category is None:
+            return
+        if default_category not in codes:
+            # keep default_estimates = None but warns user
+            if default_category in columns:
+                reason = "not among the fitted key columns"
             else:
-                if self.estimate == "mean":
-                    self.default_estimates = df.groupby(default_category, observed=True)[
-                        target_name
-                    ].mean()
-                else:
-                    self.default_estimates = df.groupby(default_category, observed=True)[
-                        target_name
-                    ].median()
+                reason = "not in X columns"
+            warnings.warn(
+                f"default_category='{default_category}' {reason}; "
+                "fallback will not be available.",
+                RuntimeWarning,
+                stacklevel=3,
+            )
+            return
+
+        # rows with code -1 (missing, or unseen during fit()) are dropped
+        dc_cat = self._categories[self.group_estimates.index.names.index(default_category)]
+        positions, est = _group_estimate([codes[default_category]], y_arr, self.estimate)
+
+        est = est.astype(np.float32)
+        self.default_estimates = pd.Series(
+            est, index=dc_cat.take(positions[0]).rename(default_category), name=target_name
+        )
+        self._default_table = np.full(len(dc_cat), np.nan, dtype=np.float32)
+        self._default_table[positions] = est
 
     def predict(self, X_):
         """
@@ -97,48 +237,56 @@ class GroupEstimate:
         if self.group_estimates is None:
             raise RuntimeError("Model has not been fitted. Call fit(X, y) before predict().")
 
-        if isinstance(X_, pd.DataFrame):
-            X_df = X_.copy()
-        else:
-            X_df = pd.DataFrame(X_, columns=self.group_estimates.index.names)
-
         expected_cols = list(self.group_estimates.index.names)
-        if list(X_df.columns) != expected_cols:
-            # reorder if they contain same names in different order
-            if set(X_df.columns) == set(expected_cols):
-                X_df = X_df[expected_cols]
-            else:
+        # rows given as dicts need the DataFrame constructor to align by name
+        records = isinstance(X_, (list, tuple)) and len(X_) > 0 and isinstance(X_[0], Mapping)
+        if isinstance(X_, (list, tuple, np.ndarray)) and not records:
+            # lists and arrays are split into columns directly, with no DataFrame
+            arr = np.asarray(X_, dtype=object)
+            if arr.ndim == 1 and (arr.size == 0 or len(expected_cols) == 1):
+                arr = arr.reshape(-1, len(expected_cols))
+            if arr.ndim != 2 or arr.shape[1] != len(expected_cols):
                 raise ValueError(
-                    f"Prediction input columns {list(X_df.columns)} do not match expected "
+                    f"Prediction input has shape {arr.shape}; expected rows of "
+                    f"{len(expected_cols)} values for columns {expected_cols}."
+                )
+            columns = list(arr.T)
+        else:
+            if not isinstance(X_, pd.DataFrame):
+                X_ = pd.DataFrame(X_, columns=expected_cols)
+            if list(X_.columns) != expected_cols and set(X_.columns) != set(expected_cols):
+                raise ValueError(
+                    f"Prediction input columns {list(X_.columns)} do not match expected "
                     f"{expected_cols}."
                 )
+            # select by name, which also handles a different column order
+            columns = [X_[c] for c in expected_cols]
 
-        results = []
-        missing_count = 0
-
-        for _, row in X_df.iterrows():
-            key = tuple(row.values)
+        # Map each column to its fitted category codes (-1 if unseen)
+        codes = [cat.get_indexer(col) for cat, col in zip(self._categories, columns)]
 
-            # Exact match for a known group
-            if key in self.group_estimates.index:
-                results.append(self.group_estimates.loc[key])
-
-            # Fallback: use single-category estimate if available
-            elif self.default_category is not None and self.default_category in X_df.columns:
-                cat_value = row[self.default_category]
-                if self.default_estimates is not None and cat_value in self.default_estimates.index:
-                    results.append(self.default_estimates.loc[cat_value])
-                else:
-                    results.append(np.nan)
-                    missing_count += 1
+        # Gather from the float32 estimates into a float64 result
+        out = np.full(len(codes[0]), np.nan)
+        if self._table is not None:
+            valid = np.logical_and.reduce([code >= 0 for code in codes])
+            out[valid] = self._table[tuple(code[valid] for code in codes)]
+        else:
+            pos = self._group_codes.get_indexer(pd.MultiIndex.from_arrays(codes))
+            found = pos >= 0
+            out[found] = self.group_estimates.to_numpy()[pos[found]]
 
-            # If no match and no fallback
-            else:
-                results.append(np.nan)
-                missing_count += 1
+        # Fallback: use single-category estimate where the full group is missing
+        if self._default_table is not None:
+            dc_codes = codes[expected_cols.index(self.default_category)]
+            missing = np.isnan(out) & (dc_codes >= 0)
+            out[missing] = self._default_table[dc_codes[missing]]
 
+        missing_count = int(np.isnan(out).sum())
         if missing_count > 0:
-            print(f"{missing_count} group(s) were missing; returned NaN for those.")
+            warnings.warn(
+                f"{missing_count} group(s) were missing; returned NaN for those.",
+                RuntimeWarning,
+                stacklevel=2,
+            )
 
-        # Convert results to array
-        return np.array([float(r) if not pd.isna(r) else np.nan for r in results])
\ No newline at end of file
+        return out